@@ -2,7 +2,6 @@
 import numpy as np
 import math
 import matplotlib.pyplot as plt
-import itertools
 
 
 def shiny_hunt(
@@ -156,7 +155,120 @@ def shiny_hunt(
         return results
 
 
-def boss_completion(rates, base_rate=None, attempts=None, verbose=True):
+def _subset_pass(probs):
+    """Computes the first two moments and the CDF terms of the completion time by inclusion-exclusion
+
+    Parameters
+    ----------
+    probs : list
+        per-attempt probability of obtaining each item
+
+    Returns
+    -------
+    tuple
+        mean, second moment, per-item marginal means, and the (subset probability, sign) arrays
+        used to evaluate the exact CDF
+    """
+
+    # build the summed probability and inclusion-exclusion sign of every subset of items
+    subset_prob = np.zeros(1)
+    subset_sign = -np.ones(1)
+    for prob in probs:
+        subset_prob = np.concatenate([subset_prob, subset_prob + prob])
+        subset_sign = np.concatenate([subset_sign, -subset_sign])
+
+    # drop the empty subset
+    subset_prob = subset_prob[1:]
+    subset_sign = subset_sign[1:]
+
+    # E[T] and E[T^2] from the geometric waiting time until any item of each subset drops
+    mean = float(np.sum(subset_sign / subset_prob))
+    second_moment = float(np.sum(subset_sign * (2 - subset_prob) / subset_prob**2))
+
+    # expected attempts until each individual item arrives (singleton subsets)
+    marginals = [1 / prob for prob in probs]
+
+    return mean, second_moment, marginals, subset_prob, subset_sign
+
+
+def _subset_quantiles(values, subset_log_stay, subset_sign, mean, variance, lower):
+    """Finds the smallest numbers of attempts whose exact completion probability reaches each value
+
+    Parameters
+    ----------
+    values : list
+        increasing target completion probabilities between 0 and 1
+    subset_log_stay : numpy.ndarray
+        log of the per-attempt probability of missing every item of each non-empty subset
+    subset_sign : numpy.ndarray
+        inclusion-exclusion sign of every non-empty subset of items
+    mean : float
+        expected number of attempts
+    variance : float
+        variance of the number of attempts
+    lower : int
+        number of attempts known to have a completion probability below the first value
+
+    Returns
+    -------
+    list
+        number of attempts for each value
+    """
+
+    signed_log_stay = subset_sign * subset_log_stay
+
+    # two preallocated buffers, so the terms at the upper end of the bracket can be kept
+    buffers = [np.empty_like(subset_log_stay), np.empty_like(subset_log_stay)]
+
+    def subset_terms(n, keep):
+        """Probability of missing every item of each subset in n attempts"""
+        terms = buffers[0] if buffers[0] is not keep else buffers[1]
+        np.multiply(subset_log_stay, n, out=terms)
+
+        # clip vanishing terms, the exponential is very slow once they underflow
+        np.maximum(terms, -700, out=terms)
+        return np.exp(terms, out=terms)
+
+    quantiles = []
+    x = max(round(mean), lower + 1)
+    terms = subset_terms(x, None)
+    for value in values:
+        # Cantelli's inequality bounds the quantile from the first two moments
+        spread = math.sqrt(value / (1 - value) * max(variance, 0))
+        upper = max(math.ceil(mean + spread) + 1, x + 1)
+        upper_terms = None
+        target = math.log(1 - value)
+
+        # Newton steps between whole numbers of attempts on the log of the probability of not
+        # being done, which is close to linear in the tail, until the bracket closes
+        while True:
+            survival = subset_sign @ terms
+            if survival > 1 - value:
+                lower = x
+            else:
+                upper, upper_terms = x, terms
+            if upper - lower <= 1:
+                break
+
+            # aim just past the estimated root, on the opposite side from the current point
+            density = -(signed_log_stay @ terms)
+            if survival > 0 and density > 0:
+                root = x + (math.log(survival) - target) * survival / density
+                x = math.ceil(root) if x == lower else math.ceil(root) - 1
+            if not lower < x < upper:
+                x = (lower + upper) // 2
+            terms = subset_terms(x, upper_terms)
+
+        quantiles.append(upper)
+
+        # quantiles are increasing, so the next search starts from this one
+        x = upper
+        terms = upper_terms if upper_terms is not None else subset_terms(x, None)
+
+    return quantiles
+
+
+def boss_completion(rates, base_rate=None, attempts=None, verbose=True, stats=False):
     """Calculates expected wins/finishes required to obtain/complete a specific set of tasks
          i.e. obtaining all unique drops from a boss
 
@@ -175,6 +287,10 @@ def boss_completion(rates, base_rate=None, attempts=None, verbose=True):
      verbose : bool
          enables printed output
 
+     stats : bool
+         enables returning a dictionary of distribution statistics (variance, 50%/90%/99% quantiles of the
+         number of attempts and the expected attempts until each individual item)
+
      Returns
      -------
     float
@@ -186,6 +302,9 @@ def boss_completion(rates, base_rate=None, attempts=None, verbose=True):
      float
          percentage between 0 and 100. Only returned when argument 'attempts' is not None
 
+     dict
+         distribution statistics. Only returned when argument 'stats' is True
+
      Examples
      ---------
      >>> boss_completion(rates = [7/24, 7/24, 3/24, 2/24, 2/24, 2/24, 1/24], base_rate= 1/20, attempts = 673, verbose= False)
@@ -195,6 +314,9 @@ def boss_completion(rates, base_rate=None, attempts=None, verbose=True):
      Expected Completion: 673
      Probability of Completion at 673 Attempts: 63.24%
      (1.0, 673, 63.24)
+
+     >>> boss_completion(rates = [1/2, 1/2], verbose= False, stats= True)
+     (1.0, 3, {'variance': 2.0, 'quantiles': {'50%': 2, '90%': 5, '99%': 8}, 'marginals': [2.0, 2.0]})
     """
 
     # Check that rates add to one for a base rate
@@ -208,53 +330,38 @@ def boss_completion(rates, base_rate=None, attempts=None, verbose=True):
             print("Rates cannot be greater than 1 or less than 0")
             return None
 
-    # generate permutations (list of lists)
-    permutations = list(itertools.permutations(rates))
-
-    # initializing overall counters
-    total_count = 0
-    total_probability = 0
-
-    # iterate through permutations
-    for perm in permutations:
-
-        # initializing permutation counters
-        permutation_count = 0
-        remaining_prob = 1
-        permutation_prob = 1
-
-        # expected attempts for next permutation event, base rate
-        if base_rate is not None:
-            for item in perm:
-                permutation_count += 1 / remaining_prob * 1 / base_rate
-                remaining_prob -= item
+    # Check no rate is 0, the item would never drop
+    for rate in rates:
+        if rate == 0:
+            print("Rates cannot be 0")
+            return None
 
-        # expected attempts for next permutation event, no base rate
-        else:
-            for item in perm:
-                permutation_count += 1 / remaining_prob
-                remaining_prob -= item
-
-        # probability of the permutation sequence
-        for i in range(len(perm)):
-            j = i - 1
-            total = 1
-            while j > -1:
-                total -= perm[j]
-                j -= 1
-            permutation_prob = permutation_prob * perm[i] / total
-
-        # count up total probabilities and total count
-        total_probability += permutation_prob
-        total_count += permutation_count * permutation_prob
+    # all items are eventually obtained only when the item table is exhaustive
+    total_probability = sum(rates)
 
     if round(total_probability, 3) != 1.0:
         raise ValueError(
             "Total Probability did not converge to 1.0. Something went wrong"
         )
 
+    # per-attempt probability of each item
+    if base_rate is not None:
+        probs = [rate * base_rate for rate in rates]
+    else:
+        probs = list(rates)
+
+    # single pass over all subsets of items
+    total_count, second_moment, marginals, subset_prob, subset_sign = _subset_pass(
+        probs
+    )
+
+    # the mean is often a whole number, so guard the truncation against float noise
+    expected_count = int(total_count * (1 + 1e-9))
+
     if verbose == True:
-        print(f"Expected Completion: {int(total_count)}")
+        print(f"Expected Completion: {expected_count}")
+
+    results = (round(total_probability, 3), expected_count)
 
     # Approximate probability as a single event for binomial probability
     if attempts is not None:
@@ -268,7 +375,6 @@ def boss_completion(rates, base_rate=None, attempts=None, verbose=True):
             if verbose == True:
                 print(f"Probability of Completion at {attempts} Attempts: 0%")
             p1_percent = 0
-            return round(total_probability, 3), int(total_count), round(p1_percent, 2)
 
         else:
             # calculate prob not done
@@ -291,9 +397,37 @@ def boss_completion(rates, base_rate=None, attempts=None, verbose=True):
                     f"Probability of Completion at {attempts} Attempts: {round(p1_percent,2)}%"
                 )
 
-            return round(total_probability, 3), int(total_count), round(p1_percent, 2)
+        results += (round(p1_percent, 2),)
+
+    # distribution statistics from the exact CDF
+    if stats:
+        variance = second_moment - total_count**2
+
+        # subsets that always drop an item contribute (almost) nothing after the first attempt
+        subset_log_stay = np.log1p(-np.minimum(subset_prob, 1 - 1e-16))
+
+        values = [0.5, 0.9, 0.99]
+
+        # completion is impossible in fewer attempts than items
+        quantiles = _subset_quantiles(
+            values, subset_log_stay, subset_sign, total_count, variance, len(rates) - 1
+        )
+        quantiles = {f"{int(value * 100)}%": n for value, n in zip(values, quantiles)}
+
+        distribution = {
+            "variance": variance,
+            "quantiles": quantiles,
+            "marginals": marginals,
+        }
+
+        if verbose == True:
+            print(f"Standard Deviation: {round(math.sqrt(distribution['variance']), 2)}")
+            for key in quantiles:
+                print(f"There is a {key} chance of completion in {quantiles[key]} attempts")
+
+        results += (distribution,)
 
-    return round(total_probability, 3), int(total_count)
+    return results
 
 
 # dry_calc function
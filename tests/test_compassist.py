@@ -151,6 +151,65 @@ def test_boss_completion():
         == None
     )
 
+    # Test for a rate of 0
+    assert boss_completion(rates=[1 / 2, 1 / 2, 0], verbose=False) == None
+
+    # Test whole number expected completions are not truncated by float noise
+    assert boss_completion(
+        rates=[3 / 8, 1 / 4, 3 / 8], base_rate=1 / 5, verbose=False
+    ) == (1.0, 29)
+    assert boss_completion(rates=[2 / 3, 1 / 3], base_rate=1 / 4, verbose=False) == (
+        1.0,
+        14,
+    )
+
+
+def test_boss_completion_stats():
+    """Test boss_completion distribution statistics against closed form results"""
+
+    # two equally likely items: T - 1 is geometric with p = 1/2, so mean 3 and variance 2
+    result = boss_completion(rates=[1 / 2, 1 / 2], verbose=False, stats=True)
+    assert result[:2] == (1.0, 3)
+    assert round(result[2]["variance"], 8) == 2.0
+    assert result[2]["marginals"] == [2.0, 2.0]
+
+    # P(T <= n) = 1 - 2 * (1/2)^n
+    assert result[2]["quantiles"] == {"50%": 2, "90%": 5, "99%": 8}
+
+    # statistics are appended after the probability of completion
+    result = boss_completion(
+        rates=[7 / 24, 7 / 24, 3 / 24, 2 / 24, 2 / 24, 2 / 24, 1 / 24],
+        base_rate=1 / 20,
+        attempts=673,
+        verbose=False,
+        stats=True,
+    )
+    assert result[:3] == (1.0, 673, 63.24)
+    assert result[3]["marginals"][-1] == 480.0
+    quantiles = list(result[3]["quantiles"].values())
+    assert quantiles == sorted(quantiles), "Quantiles are not increasing"
+    assert result[3]["quantiles"]["50%"] < 673 < result[3]["quantiles"]["90%"]
+
+
+def test_boss_completion_stats_cost(monkeypatch):
+    """Test boss_completion quantiles take a handful of exponential passes over the subsets"""
+    passes = []
+    exp = np.exp
+
+    def counting_exp(x, *args, **kwargs):
+        passes.append(np.size(x))
+        return exp(x, *args, **kwargs)
+
+    monkeypatch.setattr(np, "exp", counting_exp)
+
+    # each quantile needs the two whole numbers of attempts around it, plus a few Newton steps
+    for rates in [[1 / 14] * 14, [i / 105 for i in range(1, 15)]]:
+        passes.clear()
+        boss_completion(rates=rates, base_rate=1 / 20, verbose=False, stats=True)
+        subset_passes = [size for size in passes if size == 2**14 - 1]
+        assert 0 < len(subset_passes) <= 12, "Quantiles need too many subset passes"
+
+
 # pts_cal unit tests
 def test_pts_calc_value_wild():
     """Test is pts_calc outputs correct values for time required to achieve target"""
@@ -0,0 +1,436 @@
+from compassist.compassist import *
+from compassist.compassist import _subset_pass
+
+# imports for the differential harness
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+# number of randomized inputs generated per function
+N_CASES = 25
+
+
+# harness helpers
+def run_engines(engines):
+    """Runs every engine in parallel and returns their results, used for agreement checks only"""
+    with ThreadPoolExecutor(max_workers=len(engines)) as executor:
+        futures = {name: executor.submit(engine) for name, engine in engines.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def time_engines(engines, repeats=1):
+    """Times every engine on its own, one after another, and returns the best time (in seconds)"""
+    timings = {}
+    for name, engine in engines.items():
+        best = math.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            engine()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def record_timings(record_property, timings):
+    """Records the timing of each engine in the test report"""
+    for name, seconds in timings.items():
+        record_property(f"{name}_seconds", seconds)
+
+
+# boss_completion reference engines
+def boss_permutation_engine(rates, base_rate=None):
+    """Reference engine: weighted sum over every order in which the items can be obtained
+
+    Given an order, the wait for each next item is an independent geometric random variable,
+    so the mean and variance of each order are sums over its stages.
+    """
+    total_probability = 0
+    total_count = 0
+    total_second_moment = 0
+    roll_rate = 1 if base_rate is None else base_rate
+
+    for perm in itertools.permutations(rates):
+        remaining_prob = 1
+        permutation_prob = 1
+        permutation_count = 0
+        permutation_variance = 0
+
+        for item in perm:
+            stage_prob = remaining_prob * roll_rate
+            permutation_count += 1 / stage_prob
+            permutation_variance += (1 - stage_prob) / stage_prob**2
+            permutation_prob *= item / remaining_prob
+            remaining_prob -= item
+
+        total_probability += permutation_prob
+        total_count += permutation_prob * permutation_count
+        total_second_moment += permutation_prob * (
+            permutation_variance + permutation_count**2
+        )
+
+    return total_probability, total_count, total_second_moment - total_count**2
+
+
+def boss_markov_engine(rates, base_rate=None):
+    """Reference engine: exact CDF from the Markov chain over collected item sets
+
+    Returns a function giving the probability that every item is collected within n attempts,
+    read off the n-th power of the transition matrix (computed by repeated squaring, so any n works).
+    """
+    roll_rate = 1 if base_rate is None else base_rate
+    probs = [rate * roll_rate for rate in rates]
+    n_states = 2 ** len(probs)
+
+    transition = np.zeros((n_states, n_states))
+    for state in range(n_states):
+        for i, prob in enumerate(probs):
+            transition[state, state | (1 << i)] += prob
+        transition[state, state] += 1 - sum(probs)
+
+    def cdf(n):
+        return np.linalg.matrix_power(transition, n)[0, -1]
+
+    return cdf
+
+
+def random_rates(rng, kind):
+    """Generates a random drop table of the given kind"""
+    n_items = int(rng.integers(2, 7))
+
+    if kind == "dirichlet":
+        rates = list(rng.dirichlet(np.ones(n_items)))
+
+    # a single rate near 0, the rest share the remaining probability
+    elif kind == "near_zero":
+        tiny = 10 ** rng.uniform(-6, -3)
+        rates = [tiny] + list((1 - tiny) * rng.dirichlet(np.ones(n_items - 1)))
+
+    # integer weights as in real drop tables, summing exactly to 1
+    else:
+        weights = rng.integers(1, 10, n_items)
+        rates = [weight / weights.sum() for weight in weights]
+
+    return rates
+
+
+@pytest.mark.parametrize("kind", ["dirichlet", "near_zero", "weights"])
+@pytest.mark.parametrize("seed", range(N_CASES))
+def test_boss_completion_engines(seed, kind, record_property):
+    """Test boss_completion agrees with the reference engines on random drop tables"""
+    rng = np.random.default_rng(seed)
+    rates = random_rates(rng, kind)
+    base_rate = None if rng.random() < 0.5 else float(rng.uniform(0.01, 1))
+    attempts = int(10 ** rng.uniform(0, 4))
+
+    engines = {
+        "subset": lambda: boss_completion(
+            rates, base_rate=base_rate, attempts=attempts, verbose=False, stats=True
+        ),
+        "permutation": lambda: boss_permutation_engine(rates, base_rate),
+        "markov": lambda: boss_markov_engine(rates, base_rate),
+    }
+    results = run_engines(engines)
+    record_timings(record_property, time_engines(engines))
+
+    total_probability, total_count, probability, distribution = results["subset"]
+    reference_probability, reference_count, reference_variance = results["permutation"]
+
+    # first two moments, the mean compared before it is truncated to whole attempts
+    roll_rate = 1 if base_rate is None else base_rate
+    mean = _subset_pass([rate * roll_rate for rate in rates])[0]
+    assert total_probability == round(reference_probability, 3) == 1.0
+    assert math.isclose(mean, reference_count, rel_tol=1e-9)
+    assert total_count == int(reference_count * (1 + 1e-9))
+    assert math.isclose(
+        distribution["variance"], reference_variance, rel_tol=1e-6
+    ), "Variance does not match the permutation engine"
+
+    # marginals are the geometric mean wait for each item
+    for marginal, rate in zip(distribution["marginals"], rates):
+        assert math.isclose(marginal, 1 / (rate * roll_rate), rel_tol=1e-9)
+
+    # probability of completion stays the single event approximation
+    if attempts < len(rates):
+        assert probability == 0
+    else:
+        expected = (1 - (1 - 1 / reference_count) ** attempts) * 100
+        assert math.isclose(probability, expected, abs_tol=0.01)
+
+    # quantiles are the first attempt where the exact CDF reaches each value
+    cdf = results["markov"]
+    for key, n in distribution["quantiles"].items():
+        value = int(key[:-1]) / 100
+        assert cdf(n) >= value - 1e-12, f"CDF at {key} quantile is below {value}"
+        assert cdf(n - 1) < value + 1e-12, f"{key} quantile is not the first attempt"
+
+
+def test_boss_completion_engine_speed(record_property):
+    """Test the subset engine is faster than the permutation engine on a large drop table"""
+    rates = [7 / 24, 5 / 24, 3 / 24, 3 / 24, 2 / 24, 2 / 24, 1 / 24, 1 / 24]
+
+    engines = {
+        "subset": lambda: boss_completion(
+            rates, base_rate=1 / 20, verbose=False, stats=True
+        ),
+        "permutation": lambda: boss_permutation_engine(rates, 1 / 20),
+    }
+    results = run_engines(engines)
+    timings = time_engines(engines, repeats=3)
+    record_timings(record_property, timings)
+
+    assert results["subset"][1] == int(results["permutation"][1])
+    assert timings["subset"] < timings["permutation"], "Subset engine is slower"
+
+
+def test_boss_completion_stats_speed(record_property):
+    """Test the distribution statistics cost about the same as the mean alone
+
+    The mean takes a single pass over every subset of items, and each quantile needs the
+    CDF at the two whole numbers of attempts around it, so statistics on 16 items are held
+    within 8 times the mean alone (a bisection from scratch took over 200 times).
+    """
+    rates = [i / 136 for i in range(1, 17)]
+
+    engines = {
+        "mean": lambda: boss_completion(rates, base_rate=1 / 20, verbose=False),
+        "stats": lambda: boss_completion(
+            rates, base_rate=1 / 20, verbose=False, stats=True
+        ),
+    }
+    results = run_engines(engines)
+    timings = time_engines(engines, repeats=5)
+    record_timings(record_property, timings)
+
+    assert results["stats"][:2] == results["mean"]
+    assert timings["stats"] < 8 * timings["mean"], "Statistics cost too much"
+
+
+def tail_quantile_bounds(probs, value):
+    """Bounds the number of attempts to collect every item with probability value
+
+    The rarest item alone gives the lower bound; the union bound on the items still
+    missing, 1 - CDF(n) <= sum((1 - p)^n), gives the upper bound.
+    """
+
+    def attempts(survival):
+        # smallest whole n with survival(n) <= 1 - value, survival decreasing in n
+        lower, upper = 0, 1
+        while survival(upper) > 1 - value:
+            lower, upper = upper, upper * 2
+        while upper - lower > 1:
+            middle = (lower + upper) // 2
+            if survival(middle) > 1 - value:
+                lower = middle
+            else:
+                upper = middle
+        return upper
+
+    rarest = min(probs)
+    lower = attempts(lambda n: math.exp(n * math.log1p(-rarest)))
+    upper = attempts(lambda n: sum(math.exp(n * math.log1p(-p)) for p in probs))
+    return lower, upper
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_boss_completion_tiny_rates(seed, record_property):
+    """Test boss_completion on drop tables with rates at or below 1e-8
+
+    The permutation and Markov engines both subtract tiny rates from 1 and lose accuracy
+    here, so the results are checked against bounds computed in log space instead.
+    """
+    rng = np.random.default_rng(seed)
+    n_items = int(rng.integers(2, 7))
+    n_tiny = int(rng.integers(1, n_items))
+    tiny = list(10 ** rng.uniform(-10, -8, n_tiny))
+    rates = tiny + list((1 - sum(tiny)) * rng.dirichlet(np.ones(n_items - n_tiny)))
+    base_rate = float(rng.uniform(0.01, 1))
+    probs = [rate * base_rate for rate in rates]
+
+    engines = {
+        "subset": lambda: boss_completion(
+            rates, base_rate=base_rate, verbose=False, stats=True
+        ),
+    }
+    results = run_engines(engines)
+    record_timings(record_property, time_engines(engines))
+    total_probability, total_count, distribution = results["subset"]
+
+    # the last item takes at least as long as the rarest one, and at most as long as all in turn
+    mean = _subset_pass(probs)[0]
+    assert total_probability == 1.0
+    assert max(1 / p for p in probs) <= mean * (1 + 1e-9)
+    assert mean <= sum(1 / p for p in probs) * (1 + 1e-9)
+    assert total_count == int(mean * (1 + 1e-9))
+
+    # the same bounds hold for the second moment
+    second_moment = distribution["variance"] + mean**2
+    rarest = min(probs)
+    assert (2 - rarest) / rarest**2 <= second_moment * (1 + 1e-6)
+    upper = sum((1 - p) / p**2 for p in probs) + sum(1 / p for p in probs) ** 2
+    assert second_moment <= upper * (1 + 1e-6)
+
+    for marginal, p in zip(distribution["marginals"], probs):
+        assert math.isclose(marginal, 1 / p, rel_tol=1e-9)
+
+    for key, n in distribution["quantiles"].items():
+        lower, upper = tail_quantile_bounds(probs, int(key[:-1]) / 100)
+        assert lower <= n <= upper, f"{key} quantile is outside its bounds"
+
+
+def test_boss_completion_huge_attempts(record_property):
+    """Test the probability of completion for a million attempts against log space
+
+    The binomial factorials at this size take seconds, so the library runs once, serially.
+    """
+    rates = [1e-6, 0.5 - 5e-7, 0.5 - 5e-7]
+    attempts = 10**6
+
+    start = time.perf_counter()
+    total_probability, total_count, probability = boss_completion(
+        rates, base_rate=1 / 2, attempts=attempts, verbose=False
+    )
+    record_property("subset_seconds", time.perf_counter() - start)
+
+    mean = _subset_pass([rate / 2 for rate in rates])[0]
+    expected = -math.expm1(attempts * math.log1p(-1 / mean)) * 100
+    assert total_count == int(mean)
+    assert math.isclose(probability, expected, abs_tol=0.01)
+
+
+# dry_calc reference engine
+def dry_log_engine(p, n):
+    """Reference engine: probability of at least one occurrence in log space"""
+    if n == 0:
+        return 0.0
+    if p == 1:
+        return 1.0
+    return -math.expm1(n * math.log1p(-p))
+
+
+@pytest.mark.parametrize("seed", range(N_CASES))
+def test_dry_calc_engines(seed, record_property):
+    """Test dry_calc agrees with the reference engine on random inputs"""
+    rng = np.random.default_rng(seed)
+
+    # edge cases first, then rates from near 0 to 1
+    if seed == 0:
+        p, n = 0.0, 100
+    elif seed == 1:
+        p, n = 1.0, 0
+    elif seed == 2:
+        p, n = 1.0, 100
+    else:
+        p = float(10 ** rng.uniform(-9, 0))
+        n = int(10 ** rng.uniform(0, 4))
+
+    engines = {
+        "binomial": lambda: dry_calc(p, n, verbose=False, plot=False),
+        "log": lambda: dry_log_engine(p, n),
+    }
+    results = run_engines(engines)
+    record_timings(record_property, time_engines(engines))
+
+    assert 0 <= results["binomial"] <= 1
+    assert math.isclose(results["binomial"], results["log"], abs_tol=1e-9)
+
+
+def test_dry_calc_huge_n(record_property):
+    """Test dry_calc agrees with the reference engine for huge n"""
+    engines = {
+        "binomial": lambda: dry_calc(1e-7, 10**5, verbose=False, plot=False),
+        "log": lambda: dry_log_engine(1e-7, 10**5),
+    }
+    results = run_engines(engines)
+    record_timings(record_property, time_engines(engines))
+
+    assert math.isclose(results["binomial"], results["log"], abs_tol=1e-9)
+
+
+# shiny_hunt reference engine
+
+# published shiny odds, keyed by (generations, masuda method, shiny charm)
+SHINY_ODDS = {
+    ("1-4", False, False): 1 / 8192,
+    ("1-4", True, False): 5 / 8192,
+    ("5", False, False): 1 / 8192,
+    ("5", False, True): 3 / 8192,
+    ("5", True, False): 6 / 8192,
+    ("5", True, True): 8 / 8192,
+    ("6-9", False, False): 1 / 4096,
+    ("6-9", False, True): 3 / 4096,
+    ("6-9", True, False): 6 / 4096,
+    ("6-9", True, True): 8 / 4096,
+}
+
+
+def rounded_attempts(prob, value):
+    """Finds the number of attempts, rounded to the nearest whole attempt, at which 1 - (1 - prob)^n reaches value"""
+
+    def cdf(n):
+        return 1 - (1 - prob) ** n
+
+    # smallest whole number n with the exact solution at or below n + 0.5
+    lower, upper = -1, 1
+    while cdf(upper + 0.5) < value:
+        lower, upper = upper, upper * 2
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+        if cdf(middle + 0.5) < value:
+            lower = middle
+        else:
+            upper = middle
+    return upper
+
+
+def shiny_odds_engine(gen, masuda, shiny_charm, encounter_rate, attempt_time, hatch_time):
+    """Reference engine: shiny_hunt results from the published odds table, solved by bisection"""
+    generations = "1-4" if gen < 5 else "5" if gen == 5 else "6-9"
+    prob = SHINY_ODDS[(generations, masuda, shiny_charm)]
+
+    results = {}
+    for value in [0.25, 0.5, 0.75, 0.9, 0.99]:
+        n = rounded_attempts(prob, value)
+        if masuda:
+            result = (n, np.round(n * hatch_time / 3600, 2)) if hatch_time else n
+        else:
+            # each shiny roll needs enough attempts for a 90% chance to encounter the pokemon
+            if encounter_rate < 100:
+                n *= rounded_attempts(encounter_rate / 100, 0.9)
+            result = (n, np.round(n * attempt_time / 3600, 2))
+        results[f"{int(value * 100)}%"] = result
+    return results
+
+
+@pytest.mark.parametrize("seed", range(N_CASES))
+def test_shiny_hunt_engines(seed, record_property):
+    """Test shiny_hunt agrees with the reference engine on random hunts"""
+    rng = np.random.default_rng(seed)
+    gen = int(rng.integers(1, 10))
+    shiny_charm = bool(gen >= 5 and rng.random() < 0.5)
+    masuda = bool(gen >= 4 and rng.random() < 0.5)
+    encounter_rate = 100 if rng.random() < 0.5 else float(rng.uniform(1, 90))
+    attempt_time = int(rng.integers(1, 120))
+    hatch_time = int(rng.integers(60, 600)) if rng.random() < 0.5 else None
+
+    engines = {
+        "log": lambda: shiny_hunt(
+            gen,
+            masuda=masuda,
+            shiny_charm=shiny_charm,
+            encounter_rate=encounter_rate,
+            attempt_time=attempt_time,
+            hatch_time=hatch_time,
+            verbose=False,
+        ),
+        "odds": lambda: shiny_odds_engine(
+            gen, masuda, shiny_charm, encounter_rate, attempt_time, hatch_time
+        ),
+    }
+    results = run_engines(engines)
+    record_timings(record_property, time_engines(engines))
+
+    assert results["log"] == results["odds"], "Results do not match the odds table"